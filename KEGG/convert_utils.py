@@ -2,14 +2,18 @@
 from Bio.KEGG import REST
 import sys
 
-def map_namespace(args):
+def map_namespace(args,namespace=None,filter_file=None):
 	"""
 	Uses BioPython's KEGG REST api to convert kegg IDs to a different namespace.
 
 	Parameters
 	-------------------
 	args: ArgumentParser object
-	  Contains args.convert (namespace to conver to) and args.filter (file to filter identifiers).
+	  Contains args.species, args.convert (namespace to conver to) and args.filter (file to filter identifiers).
+	namespace: string
+	  namespace to convert to. If None (default), args.convert and args.filter are used.
+	filter_file: string
+	  file to filter identifiers of the namespace, or None (no filter). Only used when namespace is given.
 
 	Returns
 	---------------------------
@@ -23,15 +27,18 @@ def map_namespace(args):
 	kegg2id = {} # dictionary of kegg IDs to namespace IDs
 	id2kegg = {} # dictionary of namespace IDs to kegg IDs
 
-	## convert all the keggIDs to the args.convert namespace for the args.species species
-	response = REST.kegg_conv(args.convert,args.species)
+	## convert all the keggIDs to the namespace for the args.species species
+	if namespace == None:
+		namespace = args.convert
+		filter_file = args.filter
+	response = REST.kegg_conv(namespace,args.species)
 
-	## if there is a filter file (args.filter), read the file as a single column and store
+	## if there is a filter file, read the file as a single column and store
 	## identifiers as a set. Any identifier NOT in this file will subseqently be ignored.
 	to_filter = None
-	if args.filter:
+	if filter_file:
 		to_filter = set()
-		with open(args.filter) as fin:
+		with open(filter_file) as fin:
 			for line in fin:
 				to_filter.add(line.strip())
 		print('retaining only ids that are in the filter file (%d total)' % (len(to_filter)))
@@ -104,7 +111,7 @@ def c(s,delim='|'):
 
 	Parameters:
 	------------------
-	s: string, int, float, list, or set
+	s: string, int, float, list, tuple, set, or frozenset
 	   This input can be anything. Spaces are interpreted as multiples. (e.g. 'hsa:1234 hsa:5432 hsa:9432', 'hsa:1234',
 	   ['hsa:1234','hsa:5423','hsa:9432'], and 1234 are all appropriate)
 	delim: str
@@ -121,7 +128,7 @@ def c(s,delim='|'):
 		return s.replace(' ',delim)
 	elif type(s) == int or type(s) == float:
 		return str(s)
-	elif type(s) == list or type(s) == set:
+	elif type(s) == list or type(s) == tuple or type(s) == set or type(s) == frozenset:
 		return delim.join(sorted([str(a) for a in s]))
 	else:
 		print("Error: cannot compress ",s)
@@ -1,5 +1,7 @@
 ## IO utilities for reading/writing KGML and related files.
 import sys
+import gzip
+import pickle
 from convert_utils import *
 
 def write_kgml(kgml_file,kgml):
@@ -24,14 +26,13 @@ def write_kgml(kgml_file,kgml):
 
 def write_kgml_entries(entries_file,pathway):
 	"""
-	Writes KGML gene entries (id, mapped_names, kegg_names). Pathway object must 
-	have been modified to add gene_entries and gene_entries.mapped_name.  
+	Writes KGML gene entries (id, mapped_names, kegg_names).
 
 	Parameters
 	-------------------
 	entries_file: string
 	   Entries output file name 
-	pathway: Bio.KEGG.KGML.KGML_pathway object
+	pathway: kgml_records.Pathway (made by parse_kegg.read_pathway())
 
 	"""
 	
@@ -46,15 +47,13 @@ def write_kgml_entries(entries_file,pathway):
 
 def write_kgml_groups(groups_file,pathway):
 	"""
-	Writes KGML gene groups (id, component_ids, mapped_names, kegg_names). Pathway 
-	object must have been modified to add gene_groups, gene_groups.ids, 
-	gene_groups.kegg_name, and gene_groups.mapped_name.  
+	Writes KGML gene groups (id, component_ids, mapped_names, kegg_names).
 
 	Parameters
 	-------------------
 	groups_file: string
 	   Groups output file name 
-	pathway: Bio.KEGG.KGML.KGML_pathway object
+	pathway: kgml_records.Pathway (made by parse_kegg.read_pathway())
 
 	"""
 	out = open(groups_file,'w')
@@ -68,21 +67,20 @@ def write_kgml_groups(groups_file,pathway):
 
 def write_kgml_relations(relations_file,pathway):
 	"""
-	Writes KGML relations (id1, id2, relation_type, relation_subtype). Pathway 
-	object must have been modified to add gene_relations.  
+	Writes KGML relations (id1, id2, relation_type, relation_subtype).
 
 	Parameters
 	-------------------
 	relations_file: string
 	   Relations output file name 
-	pathway: Bio.KEGG.KGML.KGML_pathway object
+	pathway: kgml_records.Pathway (made by parse_kegg.read_pathway())
 
 	"""
 
 	out = open(relations_file,'w')
 	out.write('#id1\tid2\ttype\tsubtype\n')
 	for entry in pathway.gene_relations: ## NOTE: this is the gene_relations, different than ALL relations.
-		out.write('%s\t%s\t%s\t%s\n' % (entry.entry1.id,entry.entry2.id,c(entry.type),c(['%s' % s[0] for s in entry.subtypes])))
+		out.write('%s\t%s\t%s\t%s\n' % (entry.entry1,entry.entry2,c(entry.type),c(entry.subtypes)))
 	out.close()
 
 	print(' wrote to %s' % (relations_file))
@@ -91,38 +89,92 @@ def write_kgml_relations(relations_file,pathway):
 def write_edge_files(collapse_file,collapse_edges,expand_file,expand_edges):
 	"""
 	Write two sets of edge files: one of "collapsed" edges, and one of "expanded" edges.
+	Undirected edges are stored once, so both orientations are written here.
 
 	Parameters
 	---------------
 	collapse_file: string
 	   Output file of collapsed graph
 	collapse_edges: dict
-	   Dictionary of (edge,relation_type) key/value pairs
+	   Dictionary of (edge,relation_type) key/value pairs. Edges are (n1,n2,t1,t2,is_directed) tuples.
 	expand_file: string
 	   Output file of expanded graph
 	expand_edges: dict
-	   Dictionary of (edge,edge_types) key/value pairs. Edge_types include relation_types from 
-	   collapsed versions, as well as an indication of why the edge was expanded.
+	   Dictionary of (edge,edge_types) key/value pairs. Edges are (n1,n2,is_directed) tuples. Edge_types
+	   include relation_types from collapsed versions, as well as an indication of why the edge was expanded.
 
 	"""
-	## write collapsed file 
+	## write collapsed file, straight from the stored edges. Undirected edges are written in
+	## both orientations, along with the relation types of the directed edge in that orientation
+	## (if any); directed edges that are covered by an undirected edge are skipped.
+	num = 0
 	out_collapse = open(collapse_file,'w')
 	out_collapse.write('#node1\tnode2\tnode1type\tnode2type\trelation_type\n')
-	for (n1,n2,t1,t2),relation_types in collapse_edges.items():
-		# nodes are already in text form at this point.
-		out_collapse.write('%s\t%s\t%s\t%s\t%s\n' % (n1,n2,t1,t2,c(relation_types))) 
+	for (n1,n2,t1,t2,is_directed),relation_types in collapse_edges.items():
+		if is_directed:
+			if (n1,n2,t1,t2,False) in collapse_edges or (n2,n1,t2,t1,False) in collapse_edges:
+				continue
+			orientations = [(n1,n2,t1,t2)]
+		elif (n1,t1) == (n2,t2):
+			orientations = [(n1,n2,t1,t2)]
+		else:
+			orientations = [(n1,n2,t1,t2),(n2,n1,t2,t1)]
+		for (u,v,tu,tv) in orientations:
+			types = relation_types
+			if not is_directed and (u,v,tu,tv,True) in collapse_edges:
+				types = relation_types | collapse_edges[(u,v,tu,tv,True)]
+			# nodes are already in text form at this point.
+			out_collapse.write('%s\t%s\t%s\t%s\t%s\n' % (u,v,tu,tv,c(types)))
+			num+=1
 	out_collapse.close()
 
-	print(' wrote %d (collapsed) edges to %s' % (len(collapse_edges),collapse_file))
-
-	## write expanded file
+	print(' wrote %d (collapsed) edges to %s' % (num,collapse_file))
+
+	## write expanded file, sorted. Only the (n1,n2) pairs to write are sorted; edge types
+	## are looked up in the stored edges as each line is written.
+	out_pairs = []
+	for (n1,n2,is_directed) in expand_edges:
+		if is_directed:
+			if (n1,n2,False) not in expand_edges and (n2,n1,False) not in expand_edges:
+				out_pairs.append((n1,n2))
+		else:
+			out_pairs.append((n1,n2))
+			if n1 != n2:
+				out_pairs.append((n2,n1))
+	out_pairs.sort()
+	empty = set()
 	out_expand = open(expand_file,'w')
 	out_expand.write('#node1\tnode2\tedge_expansion:relation_type\n')
-	for (n1,n2) in sorted(expand_edges.keys()):
-		edge_types = expand_edges[(n1,n2)]
+	for (n1,n2) in out_pairs:
+		# undirected edges are stored in one orientation, so look up both.
+		edge_types = expand_edges.get((n1,n2,True),empty) | expand_edges.get((n1,n2,False),empty) | expand_edges.get((n2,n1,False),empty)
 		# nodes shouldn't need to be collapsed with the c() function - they are singletons!
 		out_expand.write('%s\t%s\t%s\n' % (n1,n2,c(edge_types)))
 	out_expand.close()
 	
-	print(' wrote %d (expanded) edges to %s' % (len(expand_edges),expand_file))
-	return
\ No newline at end of file
+	print(' wrote %d (expanded) edges to %s' % (len(out_pairs),expand_file))
+	return
+
+def write_binary_edge_files(collapse_file,collapse_edges,expand_file,expand_edges):
+	"""
+	Write collapsed and expanded edges as gzipped pickle files.  Unlike write_edge_files(),
+	undirected edges are kept in their stored (canonical) form: the files contain the
+	collapse_edges and expand_edges dictionaries as they are.
+
+	Parameters
+	---------------
+	collapse_file: string
+	   Output file of collapsed graph
+	collapse_edges: dict
+	   Dictionary of ((n1,n2,t1,t2,is_directed),relation_types) key/value pairs.
+	expand_file: string
+	   Output file of expanded graph
+	expand_edges: dict
+	   Dictionary of ((n1,n2,is_directed),edge_types) key/value pairs.
+
+	"""
+	for outfile,edges,name in [(collapse_file,collapse_edges,'collapsed'),(expand_file,expand_edges,'expanded')]:
+		with gzip.open(outfile,'wb') as out:
+			pickle.dump(edges,out,protocol=pickle.HIGHEST_PROTOCOL)
+		print(' wrote %d (%s) edges to %s' % (len(edges),name,outfile))
+	return
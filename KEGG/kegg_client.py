@@ -0,0 +1,114 @@
+
+## Thin client for kegg_daemon.py. Only standard-library modules that are cheap
+## to import are used here; Biopython and the mappings stay warm in the daemon.
+import sys
+import os
+import json
+import socket
+
+## default socket, in a directory that only this user can write to: $XDG_RUNTIME_DIR if
+## it is set, otherwise a 0700 directory in /tmp (made & checked by kegg_daemon.py).
+FALLBACK_DIR = '/tmp/kegg-daemon-%d' % (os.getuid())
+SOCKET = os.path.join(os.environ.get('XDG_RUNTIME_DIR') or FALLBACK_DIR,'kegg-daemon.sock')
+
+CONNECT_TIMEOUT = 5 # seconds to wait for the daemon to accept the job.
+
+def main(argv):
+	"""
+	Main function. Sends a parse_kegg.py job (or a stop request) to the daemon
+	and prints the console output of the job.
+
+	Parameters
+	---------
+	argv: list
+	   command-line arguments. --socket SOCKET, --timeout SECONDS, and --stop are
+	   handled here; all other arguments are passed on to parse_kegg.py as-is.
+
+	Returns
+	---------
+	int
+	   exit status of the job
+
+	"""
+	path,timeout,stop,job_argv = parse_arguments(argv)
+
+	if stop:
+		request = {'stop':True}
+	else:
+		request = {'argv':job_argv,'cwd':os.getcwd()}
+
+	## only talk to a socket owned by this user.
+	if os.path.lexists(path) and os.lstat(path).st_uid != os.getuid():
+		sys.exit('ERROR: %s is not owned by this user. Exiting.' % (path))
+
+	try:
+		sock = socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+		sock.settimeout(CONNECT_TIMEOUT)
+		sock.connect(path)
+	except OSError:
+		sys.exit('ERROR: cannot connect to the daemon at %s. Start it with "python3 kegg_daemon.py". Exiting.' % (path))
+
+	## jobs (e.g. --graph) can take a long time, so by default wait for the response without a timeout.
+	sock.settimeout(timeout)
+	try:
+		with sock, sock.makefile('rwb') as f:
+			f.write((json.dumps(request)+'\n').encode())
+			f.flush()
+			line = f.readline()
+	except socket.timeout:
+		sys.exit('ERROR: no response from the daemon after %s seconds. Exiting.' % (timeout))
+	except OSError as e:
+		sys.exit('ERROR: lost the connection to the daemon (%s). Exiting.' % (e))
+
+	if not line:
+		sys.exit('ERROR: daemon closed the connection without a response (it may have crashed or been stopped). Exiting.')
+	response = json.loads(line.decode())
+
+	sys.stdout.write(response['output'])
+	return response['status']
+
+def parse_arguments(argv):
+	"""
+	Argument Parser for kegg_client.py. argparse is not used so that the
+	parse_kegg.py arguments (including -h) are passed on to the daemon untouched.
+
+	Parameters
+	-----------
+	argv: list
+	   command-line arguments
+
+	Returns
+	-----------
+	string
+	   socket path
+	float
+	   seconds to wait for the response (None to wait indefinitely)
+	bool
+	   True if the daemon should be stopped
+	list
+	   arguments for parse_kegg.py
+
+	"""
+	path = SOCKET
+	timeout = None
+	stop = False
+	job_argv = []
+	i = 0
+	while i < len(argv):
+		if argv[i] == '--socket' and i+1 < len(argv):
+			path = argv[i+1]
+			i+=1
+		elif argv[i].startswith('--socket='):
+			path = argv[i].split('=',1)[1]
+		elif argv[i] == '--timeout' and i+1 < len(argv):
+			timeout = float(argv[i+1])
+			i+=1
+		elif argv[i] == '--stop':
+			stop = True
+		else:
+			job_argv.append(argv[i])
+		i+=1
+	return path,timeout,stop,job_argv
+
+if __name__ == '__main__':
+	sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,212 @@
+
+import sys
+import os
+import io
+import stat
+import traceback
+import argparse
+import json
+import contextlib
+import socketserver
+import threading
+
+## import parse_kegg (and with it, Biopython) once, when the daemon starts.
+import parse_kegg
+from convert_utils import map_namespace
+from Bio.KEGG import REST
+
+## default socket, shared with kegg_client.py.
+from kegg_client import SOCKET, FALLBACK_DIR
+
+## warm caches, shared across jobs.
+PATHWAYS = {} # species to list of pathways (from REST.kegg_list())
+MAPPINGS = {} # (species,namespace[,filter file,filter file mtime]) to kegg2id dictionary
+
+def main(args):
+	"""
+	Main function. Serves parse_kegg.py jobs on a local (unix) socket until a client
+	sends a stop request.
+
+	Parameters
+	---------
+	args: ArgumentParser object
+
+	"""
+
+	check_socket(args.socket)
+
+	server = socketserver.UnixStreamServer(args.socket,JobHandler)
+	print('serving KEGG jobs on %s' % (args.socket))
+	try:
+		server.serve_forever()
+	finally:
+		server.server_close()
+		if os.path.exists(args.socket):
+			os.remove(args.socket)
+
+	print('done!')
+	return
+
+class JobHandler(socketserver.StreamRequestHandler):
+	"""
+	Handles one job per connection. The request is a single JSON line of the form
+	{"argv": [parse_kegg.py arguments], "cwd": client working directory} or {"stop": true};
+	the response is a single JSON line of the form {"status": exit status, "output": console output}.
+
+	Jobs are handled one at a time, so they may change the working directory and stdout.
+	"""
+
+	def handle(self):
+		request = json.loads(self.rfile.readline().decode())
+		if request.get('stop'):
+			self.respond(0,'stopping daemon.\n')
+			# shutdown() waits for serve_forever() to return, so call it from another thread.
+			threading.Thread(target=self.server.shutdown).start()
+			return
+
+		print('job: %s' % (' '.join(request['argv'])))
+		status,output = run_job(request['argv'],request['cwd'])
+		self.respond(status,output)
+		return
+
+	def respond(self,status,output):
+		self.wfile.write((json.dumps({'status':status,'output':output})+'\n').encode())
+		return
+
+def run_job(argv,cwd):
+	"""
+	Runs parse_kegg.main() with the arguments in argv, using the warm pathway lists
+	and mapping dictionaries.
+
+	Parameters
+	-----------
+	argv: list
+	   parse_kegg.py arguments
+	cwd: string
+	   working directory of the client; relative paths are resolved against it.
+
+	Returns
+	-----------
+	int
+	   exit status (0 on success)
+	string
+	   console output of the job
+
+	"""
+	daemon_cwd = os.getcwd()
+	output = io.StringIO()
+	status = 0
+	with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+		try:
+			os.chdir(cwd)
+			args = parse_kegg.parse_arguments(argv)
+			pathways = None
+			if args.graph or args.list:
+				pathways = get_pathways(args.species)
+			mappings = None
+			if args.graph or args.graph_single:
+				mappings = {namespace:get_mapping(args,namespace) for namespace in parse_kegg.get_namespaces(args)}
+			parse_kegg.main(args,pathways=pathways,mappings=mappings)
+		except SystemExit as e: # argparse and parse_kegg exit on errors.
+			if e.code not in (None,0):
+				status = 1
+				if type(e.code) == str:
+					print(e.code)
+		except Exception:
+			status = 1
+			print(traceback.format_exc())
+		finally:
+			os.chdir(daemon_cwd)
+	return status,output.getvalue()
+
+def check_socket(path):
+	"""
+	Makes sure that the socket path is safe to listen on.  The fallback socket directory
+	(see kegg_client.py) is created if needed and must be a 0700 directory owned by this
+	user.  An existing socket is removed only if it is a socket owned by this user; the
+	daemon exits otherwise.
+
+	Parameters
+	-----------
+	path: string
+	   socket path
+
+	"""
+	directory = os.path.dirname(os.path.abspath(path))
+	if directory == FALLBACK_DIR:
+		if not os.path.lexists(directory):
+			os.mkdir(directory,0o700)
+		st = os.lstat(directory)
+		if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+			sys.exit('ERROR: socket directory %s must be a directory owned by this user with mode 0700. Exiting.' % (directory))
+
+	if os.path.lexists(path):
+		st = os.lstat(path)
+		if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+			sys.exit('ERROR: %s exists and is not a socket owned by this user. Exiting.' % (path))
+		os.remove(path)
+	return
+
+def get_pathways(species):
+	"""
+	Gets the (cached) list of pathways for the species.
+
+	Parameters
+	-----------
+	species: string
+	   species/taxon identifier
+
+	Returns
+	-----------
+	list
+	   pathways as returned by REST.kegg_list()
+
+	"""
+	if species not in PATHWAYS:
+		PATHWAYS[species] = list(REST.kegg_list('pathway',org=species))
+	return PATHWAYS[species]
+
+def get_mapping(args,namespace):
+	"""
+	Gets the (cached) kegg-to-namespace mapping for args.species, the namespace, and its
+	filter file (see parse_kegg.get_filters()).
+
+	Parameters
+	-----------
+	args: ArgumentParser object
+	namespace: string
+	   namespace to convert to (one of the namespaces in args.convert)
+
+	Returns
+	-----------
+	dict
+	   kegg-to-namespace mapping dictionary (see map_namespace())
+
+	"""
+	## the filter file's modification time is part of the key, so edited filter files are re-read.
+	filter_file = parse_kegg.get_filters(args)[namespace]
+	key = (args.species,namespace.lower())
+	if filter_file:
+		key += (os.path.abspath(filter_file),os.path.getmtime(filter_file))
+	if key not in MAPPINGS:
+		kegg2id,id2kegg = map_namespace(args,namespace,filter_file)
+		MAPPINGS[key] = kegg2id
+	return MAPPINGS[key]
+
+def parse_arguments():
+	"""
+	Argument Parser for kegg_daemon.py.
+
+	Returns
+	-----------
+	ArgumentParser object
+
+	"""
+	parser = argparse.ArgumentParser('KEGG Pathway Daemon. Keeps Biopython, pathway lists, and namespace mappings loaded and serves parse_kegg.py jobs from kegg_client.py.')
+	parser.add_argument('--socket',default=SOCKET,help='unix socket to listen on. Default is %s.' % (SOCKET))
+	args = parser.parse_args()
+	return args
+
+if __name__ == '__main__':
+	args = parse_arguments()
+	main(args)
@@ -0,0 +1,47 @@
+## Lightweight records for the parts of a KGML pathway that are used to make graphs.
+## A KeggPathway is built once per pathway by parse_kegg.read_pathway() (the Biopython
+## pathway object is not kept around), and projected to a Pathway for each namespace.
+from collections import namedtuple
+
+## Pathway in KEGG ID space, before it is projected to a namespace.
+## name, title: KGML pathway name and title
+## genes: dictionary of gene entry id to keggID(s), separated by spaces (e.g. 'hsa:1234 hsa:5432')
+## groups: dictionary of gene group entry id to list of component entry ids
+## relations: list of KeggRelation among genes and groups that are not ignored (see parse_kegg.ignore())
+KeggPathway = namedtuple('KeggPathway',['name','title','genes','groups','relations'])
+
+## Relation in KEGG ID space.
+## entry1, entry2: KGML entry ids
+## type: relation type (e.g. 'PPrel')
+## subtypes: tuple of relation subtype names (e.g. ('activation','phosphorylation'))
+## directed: True if the relation is directed, False otherwise (see parse_kegg.directed())
+KeggRelation = namedtuple('KeggRelation',['entry1','entry2','type','subtypes','directed'])
+
+## Gene entry.
+## id: KGML entry id
+## name: keggID(s), separated by spaces (e.g. 'hsa:1234 hsa:5432')
+## mapped_name: frozenset of mapped namespace IDs
+GeneEntry = namedtuple('GeneEntry',['id','name','mapped_name'])
+
+## Gene group (complex).
+## id: KGML entry id
+## ids: list of component entry ids
+## kegg_name: list of component keggIDs (only components that are gene entries)
+## mapped_name: frozenset of mapped namespace IDs
+GeneGroup = namedtuple('GeneGroup',['id','ids','kegg_name','mapped_name'])
+
+## Gene relation, with each endpoint resolved to its mapped IDs and entity type.
+## entry1, entry2: KGML entry ids
+## type: relation type (e.g. 'PPrel')
+## subtypes: tuple of relation subtype names (e.g. ('activation','phosphorylation'))
+## n1, n2: frozensets of mapped namespace IDs of entry1 and entry2
+## t1, t2: entity types of entry1 and entry2 ('gene' or 'group')
+## directed: True if the relation is directed, False otherwise (see parse_kegg.directed())
+GeneRelation = namedtuple('GeneRelation',['entry1','entry2','type','subtypes','n1','n2','t1','t2','directed'])
+
+## Pathway projected to a namespace (made by parse_kegg.project_pathway()).
+## name, title: KGML pathway name and title
+## gene_entries: dictionary of entry id to GeneEntry
+## gene_groups: dictionary of entry id to GeneGroup
+## gene_relations: list of GeneRelation
+Pathway = namedtuple('Pathway',['name','title','gene_entries','gene_groups','gene_relations'])
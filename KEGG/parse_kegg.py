@@ -14,20 +14,36 @@ from Bio.KEGG import REST
 from Bio.KEGG.KGML import KGML_parser
 from Bio.KEGG.KGML import KGML_pathway
 
+## shared edge pipeline (common/ lives next to KEGG/)
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','common'))
+from edge_pipeline import Edge
 
-def main(args):
+## lightweight pathway records
+from kgml_records import KeggRelation, KeggPathway, GeneEntry, GeneGroup, GeneRelation, Pathway
+
+
+def main(args,pathways=None,mappings=None):
 	"""
 	Main function.
 
 	Parameters
 	---------
 	args: ArgumentParser object
+	pathways: list
+	   pathways as returned by REST.kegg_list() for args.species. If None (default),
+	   they are listed through the REST api when --graph or --list is specified.
+	mappings: dict
+	   dictionary of namespace to kegg-to-namespace mapping dictionary, for every
+	   namespace in args.convert (with args.species and the namespace's filter file). If None (default),
+	   they are made by calls to map_namespace().
+	   kegg_daemon.py passes in warm copies of pathways and mappings.
 
 	"""
 
 	## get all the pathways listed for the species if --graph or --list is specified.
 	if args.graph or args.list:
-		pathways = REST.kegg_list('pathway',org=args.species)
+		if pathways == None:
+			pathways = REST.kegg_list('pathway',org=args.species)
 	else: # pathways is simply the single --graph_single value.
 		pathways = [args.graph_single]
 
@@ -41,120 +57,423 @@ def main(args):
 	## get interactions and make graph for each pathway
 	if args.graph or args.graph_single:
 
-		## get namespace mapper. We will always map to SOME namespace.
+		## get namespace mappers. We will always map to SOME namespace.
 		## map_namespace also takes care of filtering IDs if --filter is specified.
-		kegg2id,id2kegg = map_namespace(args)
+		namespaces = get_namespaces(args)
+		if mappings == None:
+			mappings = {}
+			filters = get_filters(args)
+			for namespace in namespaces:
+				kegg2id,id2kegg = map_namespace(args,namespace,filters[namespace])
+				mappings[namespace] = kegg2id
+
+		## with --stats, keep the expanded edges of every pathway for each namespace,
+		## and the names of all processed pathways (including those without edges).
+		stats_edges = {namespace:[] for namespace in namespaces}
+		stats_pathways = []
 
 		num = 0
 		for p in pathways:
 			num+=1
 
-			if args.graph:
-				name = p.split()[0]
-				short_name = name.split(':')[1]
-			else: # --graph_single was specified
-				name = args.graph_single
-				short_name = args.graph_single
+			name,short_name = get_pathway_names(p,args)
 
-			## get KGML file if it's not already in the output directory.
+			## parse & classify the pathway once (in KEGG ID space)...
 			print('processing pathway #%d: %s' % (num,short_name))
-			kgml_file = '%s/%s.kgml' % (args.outdir,short_name)
-			if not os.path.isfile(kgml_file):
-				print('KGML file does not exist. Pull it down from KEGG...')
-				kgml = REST.kegg_get(name,option='kgml')
-				file_utils.write_kgml(kgml_file,kgml)
-
-			# parse the pathway.
-			pathway = KGML_parser.read(open(kgml_file))
-
-			print(' %s "%s": %d entries (incl. genes & groups) & %d relations' % (pathway.name,pathway.title,len(pathway.entries),len(pathway.relations)))
-
-			# retain gene entries & map keggIDs to namespace.
-			to_delete = set()
-			pathway.gene_entries = {g:pathway.entries[g] for g in pathway.entries if pathway.entries[g].type == 'gene'}
-			for node,entry in pathway.gene_entries.items():
-				pathway.gene_entries[node].mapped_name = convert(pathway.gene_entries[node].name,kegg2id)
-				if pathway.gene_entries[node].mapped_name == None:
-					to_delete.add(node)
-			print(' deleting %d gene entries with no mapping' % (len(to_delete)))
-			for n in to_delete:
-				del pathway.gene_entries[n]
-
-			# retain gene groups & (a) add component IDs, (b) add component keggIDs, and (c) add map keggIDs to namespace.
-			to_delete = set()
-			pathway.gene_groups = {g:pathway.entries[g]for g in pathway.entries if pathway.entries[g].type == 'group'}
-			for node,entry in pathway.gene_groups.items():
-				pathway.gene_groups[node].ids = [component.id for component in entry.components]
-				pathway.gene_groups[node].kegg_name = [pathway.gene_entries[i].name for i in pathway.gene_groups[node].ids if i in pathway.gene_entries]
-				pathway.gene_groups[node].mapped_name = convert(pathway.gene_groups[node].kegg_name,kegg2id)
-				if pathway.gene_groups[node].mapped_name == None:
-					to_delete.add(node)
-			print(' deleting %d gene groups with no mapping' % (len(to_delete)))
-			for n in to_delete:
-				del pathway.gene_groups[n]
-
-			# pathway_ids are all the pathway IDs in genes & groups.
-			pathway_ids = set(pathway.gene_entries.keys()).union(set(pathway.gene_groups.keys()))
-
-			# retain relations that are among gene or group entries only and
-			pathway.gene_relations = [r for r in pathway.relations if r.entry1.id in pathway_ids and r.entry2.id in pathway_ids and not ignore(r)]
-
-			print(' %d entries, %d groups, & %d relations after retaining genes & groups and removing ignored edges.' % (len(pathway.gene_entries),len(pathway.gene_groups),len(pathway.gene_relations)))
-
-			# write entries, groups, and relations files (just for 'gene' and 'group' entities and relations)
-			entries_file = '%s/%s-gene-entries.txt' % (args.outdir,short_name)
-			file_utils.write_kgml_entries(entries_file,pathway)
-
-			groups_file = '%s/%s-gene-groups.txt' % (args.outdir,short_name)
-			file_utils.write_kgml_groups(groups_file,pathway)
-
-			relations_file = '%s/%s-gene-relations.txt' % (args.outdir,short_name)
-			file_utils.write_kgml_relations(relations_file,pathway)
-
-			## generate graphs
-			relation_counts = {'dir':0,'undir':0}
-
-			# instead of writing edges directly, keep dictionaries that are keyed
-			# by the edge identifiers.  Sometimes there are duplicate edges for various
-			# reasons - this guarantees that we will only write unique edges to the file at the end.
-			collapse_edges = {} # dictionary of collapsed edges
-			expand_edges = {} # dictionary of expanded edges
-			expanded_groups = set() # this will keep track of the groups that we have already expanded.
-			for entry in pathway.gene_relations:
-
-				## get node names, types, and whether the interaction is directed.
-				n1,n2,t1,t2,is_directed = get_relation_entry_info(entry,pathway)
-
-				if is_directed:
-					relation_counts['dir']+=1
-				else:
-					relation_counts['undir']+=1
-
-				## store collapsed edges
-				add_to_dictionary(collapse_edges,(c(n1),c(n2),t1,t2),[e[0] for e in entry.subtypes])
-				if not is_directed:
-					add_to_dictionary(collapse_edges,(c(n2),c(n1),t2,t1),[e[0] for e in entry.subtypes])
-
-				# expand edges
-				expanded, expanded_groups = expand_entry_edges(n1,n2,t1,t2,c([e[0] for e in entry.subtypes]),expanded_groups)
-
-				## store expanded edges
-				for n1,n2,t in expanded:
-					add_to_dictionary(expand_edges,(n1,n2),t)
-					if not is_directed:
-						add_to_dictionary(expand_edges,(n2,n1),t)
-
-			print('Processed %d directed and %d undirected KEGG relations' % (relation_counts['dir'],relation_counts['undir']))
-
-			## write edge files
-			collapse_file = '%s/%s-collapsed-edges.txt' % (args.outdir,short_name)
-			expand_file = '%s/%s-expanded-edges.txt' % (args.outdir,short_name)
-			file_utils.write_edge_files(collapse_file,collapse_edges,expand_file,expand_edges)
+			kgml_file = get_kgml(name,short_name,args.outdir)
+			kegg_pathway = read_pathway(kgml_file)
+			stats_pathways.append(short_name)
+
+			## ...and project it to each namespace.
+			for namespace in namespaces:
+				outdir = get_outdir(args,namespace)
+				if len(namespaces) > 1:
+					print(' namespace %s:' % (namespace))
+				pathway = project_pathway(kegg_pathway,mappings[namespace])
+
+				# write entries, groups, and relations files (just for 'gene' and 'group' entities and relations)
+				entries_file = '%s/%s-gene-entries.txt' % (outdir,short_name)
+				file_utils.write_kgml_entries(entries_file,pathway)
+
+				groups_file = '%s/%s-gene-groups.txt' % (outdir,short_name)
+				file_utils.write_kgml_groups(groups_file,pathway)
+
+				relations_file = '%s/%s-gene-relations.txt' % (outdir,short_name)
+				file_utils.write_kgml_relations(relations_file,pathway)
+
+				## generate graphs
+				collapse_edges,expand_edges = make_edges(pathway)
+
+				## write edge files
+				collapse_file = '%s/%s-collapsed-edges.txt' % (outdir,short_name)
+				expand_file = '%s/%s-expanded-edges.txt' % (outdir,short_name)
+				file_utils.write_edge_files(collapse_file,collapse_edges,expand_file,expand_edges)
+
+				## write binary edge files, which keep undirected edges in canonical form.
+				if args.binary:
+					file_utils.write_binary_edge_files(collapse_file.replace('.txt','.pkl.gz'),collapse_edges,expand_file.replace('.txt','.pkl.gz'),expand_edges)
+
+				if args.stats:
+					for (n1,n2,is_directed),edge_types in expand_edges.items():
+						stats_edges[namespace].append((short_name,n1,n2,is_expansion(edge_types)))
+
+		## write a graph statistics report for each namespace.
+		if args.stats:
+			import graph_stats
+			for namespace in namespaces:
+				graph_stats.write_report('%s/graph-stats.txt' % (get_outdir(args,namespace)),stats_edges[namespace],pathways=stats_pathways)
 
 		print('Done making graph for each pathway.')
 
 	return
 
+def kgml_edges(pathways,args,kegg2id):
+	"""
+	Source stage for the shared edge pipeline (see common/edge_pipeline.py).
+	Yields the expanded edges of each pathway, one pathway at a time, so the
+	graph for the whole species is never held in memory.
+
+	Parameters
+	-----------
+	pathways: list
+	   pathways as returned by REST.kegg_list() (or a list of pathway identifiers
+	   if args.graph_single is specified)
+	args: ArgumentParser object
+	   Contains args.outdir (directory for KGML files) and args.graph_single.
+	kegg2id: dict
+	   A kegg-to-namespace mapping dictionary (provided by a call to map_namespace())
+
+	Yields
+	-----------
+	Edge
+	   expanded edge record. Undirected edges are yielded once, with directed=False and
+	   sorted nodes, so they dedupe against undirected edges from other sources.
+
+	"""
+	for p in pathways:
+		name,short_name = get_pathway_names(p,args)
+		kgml_file = get_kgml(name,short_name,args.outdir)
+		pathway = project_pathway(read_pathway(kgml_file),kegg2id)
+		collapse_edges,expand_edges = make_edges(pathway)
+		for (n1,n2,is_directed),edge_types in expand_edges.items():
+			if not is_directed:
+				n1,n2 = sorted([n1,n2])
+			yield Edge(n1,n2,is_directed,frozenset(edge_types),'KEGG',short_name)
+	return
+
+def get_pathway_names(p,args):
+	"""
+	Gets the full and short pathway names.
+
+	Parameters
+	-----------
+	p: string
+	   pathway as listed by REST.kegg_list() (e.g. 'path:hsa04310\tWnt signaling pathway')
+	   or the pathway identifier if --graph_single is specified.
+	args: ArgumentParser object
+
+	Returns
+	-----------
+	string
+	   pathway name (e.g. 'path:hsa04310')
+	string
+	   short pathway name (e.g. 'hsa04310')
+
+	"""
+	if args.graph:
+		name = p.split()[0]
+		short_name = name.split(':')[1]
+	else: # --graph_single was specified
+		name = args.graph_single
+		short_name = args.graph_single
+	return name,short_name
+
+def get_namespaces(args):
+	"""
+	Gets the namespaces to convert kegg IDs to.
+
+	Parameters
+	-----------
+	args: ArgumentParser object
+	   Contains args.convert, a comma-separated list of case insensitive namespaces (e.g. 'uniprot,ncbi-geneid').
+
+	Returns
+	-----------
+	list
+	   lowercase namespaces (without duplicates), in the order they were specified.
+
+	"""
+	namespaces = []
+	for namespace in args.convert.split(','):
+		namespace = namespace.strip().lower()
+		if namespace != '' and namespace not in namespaces:
+			namespaces.append(namespace)
+	return namespaces
+
+def get_filters(args):
+	"""
+	Gets the filter file for each namespace. args.filter is either a single file,
+	which is only allowed with a single namespace, or a comma-separated list of
+	namespace=file pairs (e.g. 'uniprot=uniprot-swissprot-ids.txt').
+
+	Parameters
+	-----------
+	args: ArgumentParser object
+	   Contains args.convert and args.filter.
+
+	Returns
+	-----------
+	dict
+	   dictionary of namespace (see get_namespaces()) to filter file, or None if the namespace is not filtered.
+
+	"""
+	namespaces = get_namespaces(args)
+	filters = {namespace:None for namespace in namespaces}
+	if not args.filter:
+		return filters
+	if '=' not in args.filter:
+		filters[namespaces[0]] = args.filter
+		return filters
+	for pair in args.filter.split(','):
+		namespace,filter_file = pair.split('=',1)
+		filters[namespace.strip().lower()] = filter_file.strip()
+	return filters
+
+def get_outdir(args,namespace):
+	"""
+	Gets the output directory for the namespace. If a single namespace is specified,
+	this is args.outdir; otherwise, it is the namespace directory within args.outdir.
+
+	Parameters
+	-----------
+	args: ArgumentParser object
+	namespace: string
+
+	Returns
+	-----------
+	string
+	   output directory
+
+	"""
+	if len(get_namespaces(args)) == 1:
+		return args.outdir
+	return '%s/%s' % (args.outdir,namespace)
+
+def get_kgml(name,short_name,outdir):
+	"""
+	Gets the KGML file for the pathway, pulling it down from KEGG if it is not
+	already in the output directory.
+
+	Parameters
+	-----------
+	name: string
+	   pathway name
+	short_name: string
+	   short pathway name, used as the KGML file prefix.
+	outdir: string
+	   output directory
+
+	Returns
+	-----------
+	string
+	   KGML file name
+
+	"""
+	kgml_file = '%s/%s.kgml' % (outdir,short_name)
+	if not os.path.isfile(kgml_file):
+		print('KGML file does not exist. Pull it down from KEGG...')
+		kgml = REST.kegg_get(name,option='kgml')
+		file_utils.write_kgml(kgml_file,kgml)
+	return kgml_file
+
+def read_pathway(kgml_file):
+	"""
+	Parses the KGML file and retains gene entries, gene groups, and relations
+	that are among gene or group entries only, in KEGG ID space.  Relations are
+	classified (ignored or not, directed or not) here, once, regardless of how many
+	namespaces the pathway is projected to; the Biopython pathway object is released
+	once the records are built.
+
+	Parameters
+	-----------
+	kgml_file: string
+	   KGML file name
+
+	Returns
+	-----------
+	kgml_records.KeggPathway
+
+	"""
+	# parse the pathway.
+	with open(kgml_file) as fin:
+		kgml = KGML_parser.read(fin)
+
+	print(' %s "%s": %d entries (incl. genes & groups) & %d relations' % (kgml.name,kgml.title,len(kgml.entries),len(kgml.relations)))
+
+	# retain gene entries (keggIDs) and gene groups (component IDs).
+	genes = {node:entry.name for node,entry in kgml.entries.items() if entry.type == 'gene'}
+	groups = {node:[component.id for component in entry.components] for node,entry in kgml.entries.items() if entry.type == 'group'}
+
+	# retain relations that are among gene or group entries only and are not ignored.
+	relations = []
+	for r in kgml.relations:
+		if (r.entry1.id in genes or r.entry1.id in groups) and (r.entry2.id in genes or r.entry2.id in groups) and not ignore(r):
+			relations.append(KeggRelation(r.entry1.id,r.entry2.id,r.type,tuple(s[0] for s in r.subtypes),directed(r)))
+
+	return KeggPathway(kgml.name,kgml.title,genes,groups,relations)
+
+def project_pathway(kegg_pathway,kegg2id):
+	"""
+	Projects a pathway in KEGG ID space to a namespace.  Entries and groups with no
+	mapping are removed (along with their relations), and each relation is resolved
+	to the mapped IDs and entity types of its entries.
+
+	Parameters
+	-----------
+	kegg_pathway: kgml_records.KeggPathway (made by read_pathway())
+	kegg2id: dict
+	   A kegg-to-namespace mapping dictionary (provided by a call to map_namespace())
+
+	Returns
+	-----------
+	kgml_records.Pathway
+
+	"""
+	# retain gene entries & map keggIDs to namespace.
+	gene_entries = {}
+	num_deleted = 0
+	for node,name in kegg_pathway.genes.items():
+		mapped_name = convert(name,kegg2id)
+		if mapped_name == None:
+			num_deleted+=1
+			continue
+		gene_entries[node] = GeneEntry(node,name,frozenset(mapped_name))
+	print(' deleting %d gene entries with no mapping' % (num_deleted))
+
+	# retain gene groups & (a) add component IDs, (b) add component keggIDs, and (c) add map keggIDs to namespace.
+	gene_groups = {}
+	num_deleted = 0
+	for node,ids in kegg_pathway.groups.items():
+		kegg_name = [gene_entries[i].name for i in ids if i in gene_entries]
+		mapped_name = convert(kegg_name,kegg2id)
+		if mapped_name == None:
+			num_deleted+=1
+			continue
+		gene_groups[node] = GeneGroup(node,ids,kegg_name,frozenset(mapped_name))
+	print(' deleting %d gene groups with no mapping' % (num_deleted))
+
+	# retain relations that are among mapped gene or group entries only and
+	# resolve each entry to its mapped names & entity type.
+	gene_relations = []
+	for r in kegg_pathway.relations:
+		e1 = gene_entries.get(r.entry1) or gene_groups.get(r.entry1)
+		e2 = gene_entries.get(r.entry2) or gene_groups.get(r.entry2)
+		if e1 == None or e2 == None:
+			continue
+		t1 = 'gene' if r.entry1 in gene_entries else 'group'
+		t2 = 'gene' if r.entry2 in gene_entries else 'group'
+		gene_relations.append(GeneRelation(r.entry1,r.entry2,r.type,r.subtypes,e1.mapped_name,e2.mapped_name,t1,t2,r.directed))
+
+	print(' %d entries, %d groups, & %d relations after retaining genes & groups and removing ignored edges.' % (len(gene_entries),len(gene_groups),len(gene_relations)))
+
+	return Pathway(kegg_pathway.name,kegg_pathway.title,gene_entries,gene_groups,gene_relations)
+
+def make_edges(pathway):
+	"""
+	Makes the collapsed and expanded edges from the gene relations of the pathway.
+
+	Parameters
+	-----------
+	pathway: kgml_records.Pathway
+
+	Returns
+	-----------
+	dict
+	   dictionary of collapsed edges, keyed by (n1,n2,t1,t2,is_directed)
+	dict
+	   dictionary of expanded edges, keyed by (n1,n2,is_directed)
+	   Undirected edges are stored once, in canonical orientation (see canonical_edge()).
+
+	"""
+	relation_counts = {'dir':0,'undir':0}
+
+	# instead of writing edges directly, keep dictionaries that are keyed
+	# by the edge identifiers.  Sometimes there are duplicate edges for various
+	# reasons - this guarantees that we will only write unique edges to the file at the end.
+	collapse_edges = {} # dictionary of collapsed edges
+	expand_edges = {} # dictionary of expanded edges
+	expanded_groups = set() # this will keep track of the groups that we have already expanded.
+	for relation in pathway.gene_relations:
+
+		## node names, types, and whether the interaction is directed were resolved in project_pathway() (once per namespace).
+		n1,n2,t1,t2,is_directed = relation.n1,relation.n2,relation.t1,relation.t2,relation.directed
+
+		if is_directed:
+			relation_counts['dir']+=1
+		else:
+			relation_counts['undir']+=1
+
+		## store collapsed edges (undirected edges are stored once; both orientations are written by file_utils)
+		add_to_dictionary(collapse_edges,canonical_edge((c(n1),t1),(c(n2),t2),is_directed),relation.subtypes)
+
+		# expand edges
+		expanded, expanded_groups = expand_entry_edges(n1,n2,t1,t2,c(list(relation.subtypes)),is_directed,expanded_groups)
+
+		## store expanded edges
+		for u1,u2,t,d in expanded:
+			add_to_dictionary(expand_edges,canonical_edge(u1,u2,d),t)
+
+	print('Processed %d directed and %d undirected KEGG relations' % (relation_counts['dir'],relation_counts['undir']))
+
+	return collapse_edges,expand_edges
+
+def is_expansion(edge_types):
+	"""
+	Checks if an expanded edge only comes from group (complex) or family expansion,
+	i.e. it is not a one-to-one mapping of any collapsed edge.
+
+	Parameters
+	--------------
+	edge_types: set
+	   edge types of the expanded edge (see expand_entry_edges())
+
+	Returns
+	--------------
+	bool
+	   True if the edge only comes from expansion, False otherwise.
+
+	"""
+	for t in edge_types:
+		if t.startswith('one_to_one_mapping'):
+			return False
+	return True
+
+def canonical_edge(n1,n2,is_directed):
+	"""
+	Makes the key of an edge.  Undirected edges are put in canonical (sorted) orientation,
+	so that (n1,n2) and (n2,n1) are stored once.
+
+	Parameters
+	--------------
+	n1: string or tuple
+	   first node (a node ID, or a (node name,node type) tuple for collapsed edges)
+	n2: string or tuple
+	   second node
+	is_directed: bool
+	   True if the edge is directed; False otherwise
+
+	Returns
+	--------------
+	tuple
+	   (n1,n2,is_directed) for expanded edges, or (n1,n2,t1,t2,is_directed) for collapsed edges.
+
+	"""
+	if not is_directed and n2 < n1:
+		n1,n2 = n2,n1
+	if type(n1) == tuple:
+		return n1[:1]+n2[:1]+n1[1:]+n2[1:]+(is_directed,)
+	return (n1,n2,is_directed)
+
 def add_to_dictionary(d,key,value):
 	"""
 	Utility function to add an entry to a dictionary that stores edges.
@@ -165,7 +484,7 @@ def add_to_dictionary(d,key,value):
 	   dictionary to add key/value pair
 	key: string
 	   key
-	value: string, list, or set
+	value: string, list, tuple, or set
 	   add all elements of value to the set keyed by the key in the dictionary.
 
 	"""
@@ -175,63 +494,23 @@ def add_to_dictionary(d,key,value):
 
 	# if the value is a list or a set, add all elements to the set.
 	# if the value is a string, just add the single element to the set.
-	if type(value) == list or type(value) == set:
-		d[key].update(set(value))
+	if type(value) == list or type(value) == tuple or type(value) == set:
+		d[key].update(value)
 	else:
 		d[key].add(value)
 
 	return
 
-def get_relation_entry_info(entry,pathway):
-	"""
-	Extracts the nodes and node types for a relation entry.
-
-	Parameters
-	-------------
-	entry: Bio.KEGG.KGML.KGML_pathway.Entry object
-	pathway: Bio.KEGG.KGML.KGML_pathway.Pathway object
-
-	Returns
-	-------------
-	list
-	   node1 mapped name(s)
-	list
-	   node2 mapped names(s)
-	string
-	   node1 entity type ('gene' or 'group')
-	string
-	   node2 entity type ('gene' or 'group')
-	bool
-	   True if the relation is directed; False otherwise
-
-	"""
-	is_directed = directed(entry)
-	e1 = entry.entry1.id
-	if e1 in pathway.gene_entries:
-		n1  = pathway.gene_entries[e1].mapped_name
-		t1 = pathway.gene_entries[e1].type
-	else:
-		n1 = pathway.gene_groups[e1].mapped_name
-		t1 = pathway.gene_groups[e1].type
-	e2 = entry.entry2.id
-	if e2 in pathway.gene_entries:
-		n2  = pathway.gene_entries[e2].mapped_name
-		t2 = pathway.gene_entries[e2].type
-	else:
-		n2 = pathway.gene_groups[e2].mapped_name
-		t2 = pathway.gene_groups[e2].type
-	return n1,n2,t1,t2,is_directed
-
-def expand_entry_edges(n1,n2,t1,t2,rel_type,expanded_groups):
+def expand_entry_edges(n1,n2,t1,t2,rel_type,is_directed,expanded_groups):
 	"""
 	Take a collapsed edge and "expand" it by adding edges for certain
 	pairs of elements.  Entities labeled as "groups" are protein complexes.
 
 	Parameters
 	------------
-	n1: string, string with spaces, or list
+	n1: set or frozenset
 	  IDs for the first node in the collapsed edge
-	n2: string, string with spaces, or list
+	n2: set or frozenset
 	  IDs for the second node in the collapsed edge
 	t1: string ('gene' or 'group')
 	  entity type of the first node
@@ -239,41 +518,45 @@ def expand_entry_edges(n1,n2,t1,t2,rel_type,expanded_groups):
 	  entity type of the second node
 	rel_type: string
 	  Relation type of the collapsed edge (e.g. 'activation')
+	is_directed: bool
+	  True if the collapsed edge is directed; False otherwise
 	expanded_groups: set
 	  Set of group entities that have already been expanded (no need to re-process them)
 
 	Returns
 	--------------
 	set
-	  expanded edges, represented as 3-tuples of (n1,n2,edge_type)
+	  expanded edges, represented as 4-tuples of (n1,n2,edge_type,is_directed)
+	  Group expansion edges are undirected and are added for each pair only once.
 	  edge_type may be one of 'group_expansion','one_to_one_mapping:rel_type', or 'mult_mapping_expansion:rel_type'
 	set
 	  expanded_groups set
 
 	"""
 
-	expanded = set() # set of 3-tuples that will conain (n1,n2,edge_type)
+	expanded = set() # set of 4-tuples that will conain (n1,n2,edge_type,is_directed)
 
-	## if n1 is a group and we haven't expanded it yet, introduce all vs. all edges.
+	## if n1 is a group and we haven't expanded it yet, introduce all vs. all (undirected) edges.
 	if t1 == 'group' and c(n1) not in expanded_groups:
-		for u1,u2 in itertools.permutations(n1,2):
-			expanded.add((u1,u2,'group_expansion'))
+		for u1,u2 in itertools.combinations(sorted(n1),2):
+			expanded.add((u1,u2,'group_expansion',False))
 		expanded_groups.add(c(n1))
 
-	## if n2 is a group and we haven't expanded it yet, introduce all vs. all edges.
+	## if n2 is a group and we haven't expanded it yet, introduce all vs. all (undirected) edges.
 	if t2 == 'group' and c(n2) not in expanded_groups:
-		for u1,u2 in itertools.permutations(n2,2):
-			expanded.add((u1,u2,'group_expansion'))
+		for u1,u2 in itertools.combinations(sorted(n2),2):
+			expanded.add((u1,u2,'group_expansion',False))
 		expanded_groups.add(c(n2))
 
 	## if n1 and n2 are single nodes, we have a one-to-one mapping of the collapsed edge.
 	if len(n1) == 1 and len(n2) == 1:
-		expanded.add((n1.pop(),n2.pop(),'one_to_one_mapping:%s' % (rel_type)))
+		# n1 and n2 are shared by every relation of the entry, so don't pop() from them.
+		expanded.add((next(iter(n1)),next(iter(n2)),'one_to_one_mapping:%s' % (rel_type),is_directed))
 	else:
 		# otherwise, the edges are expanded from a multiple mappings (many-to-one, one-to-many, or many-to-many).
 		# for now, these are all considered as "multiple mappings".
 		for u1,u2 in itertools.product(n1,n2):
-			expanded.add((u1,u2,'mult_mapping_expansion:%s' % (rel_type)))
+			expanded.add((u1,u2,'mult_mapping_expansion:%s' % (rel_type),is_directed))
 
 	return expanded,expanded_groups
 
@@ -375,10 +658,15 @@ def directed(entry):
 
 	return
 
-def parse_arguments():
+def parse_arguments(argv=None):
 	"""
 	Argument Parser for parse_kegg.py.
 
+	Parameters
+	-----------
+	argv: list
+	   arguments to parse. If None (default), sys.argv is parsed.
+
 	Returns
 	-----------
 	ArgumentParser object
@@ -389,10 +677,12 @@ def parse_arguments():
 	parser.add_argument('--graph',action='store_true',help='make graph for all pathways from the specified species.')
 	parser.add_argument('--graph_single',help='make graph of a single pathway. Pass in the pathway identifier (e.g. hsa04310).')
 	parser.add_argument('-s','--species',default='hsa',help='species/taxon identifier. Default is hsa.')
-	parser.add_argument('-c','--convert',default='uniprot',help='convert kegg id to this case insensitive id/namespace (ncbi-geneid | uniprot). Default is uniprot')
-	parser.add_argument('-f','--filter',help='filter converted IDs by single-column file of ids. Only IDs that appear in this file will be used.')
+	parser.add_argument('-c','--convert',default='uniprot',help='convert kegg id to this case insensitive id/namespace (ncbi-geneid | uniprot). Pass a comma-separated list (e.g. uniprot,ncbi-geneid) to convert to each namespace in the same pass; files for each namespace are written to OUTDIR/namespace. Default is uniprot')
+	parser.add_argument('-f','--filter',help='filter converted IDs by single-column file of ids. Only IDs that appear in this file will be used. With multiple namespaces, pass a comma-separated list of namespace=file pairs (e.g. uniprot=uniprot-swissprot-ids.txt); namespaces without a file are not filtered.')
 	parser.add_argument('-o','--outdir',help='outfile directory.')
-	args = parser.parse_args()
+	parser.add_argument('--stats',action='store_true',help='write a report of graph statistics (degrees, connected components, pathway overlap, and expanded edges) to OUTDIR/graph-stats.txt. Requires numpy and scipy.')
+	parser.add_argument('-b','--binary',action='store_true',help='also write collapsed and expanded edges as compressed pickle files, with undirected edges stored once.')
+	args = parser.parse_args(argv)
 
 	## one of --list, -graph, or --graph_single must be specified.
 	if not(args.list or args.graph or args.graph_single):
@@ -406,14 +696,39 @@ def parse_arguments():
 	if (args.graph or args.graph_single) and not args.outdir:
 		sys.exit('ERROR: --species and --outdir must be specified to make graphs. Exiting.')
 
+	## at least one namespace must be specified.
+	if not get_namespaces(args):
+		sys.exit('ERROR: --convert must specify at least one namespace. Exiting.')
+
+	## --stats requires numpy and scipy.
+	if args.stats:
+		try:
+			import graph_stats
+		except ImportError:
+			sys.exit('ERROR: --stats requires numpy and scipy. Exiting.')
+
+	## a single filter file can only be used with a single namespace; otherwise,
+	## each filter file must be given for one of the namespaces.
+	if args.filter:
+		if '=' not in args.filter:
+			if len(get_namespaces(args)) > 1:
+				sys.exit('ERROR: with multiple namespaces, --filter must be a list of namespace=file pairs. Exiting.')
+		else:
+			for pair in args.filter.split(','):
+				if '=' not in pair or pair.split('=',1)[0].strip().lower() not in get_namespaces(args):
+					sys.exit('ERROR: --filter "%s" is not a namespace=file pair for a namespace in --convert. Exiting.' % (pair))
+
 	## if a filter file is specified, it must exist.
-	if args.filter and not os.path.isfile(args.filter):
-		sys.exit('ERROR: namespace file filter "%s" does not exist. Exiting.' % (args.filter))
+	for filter_file in get_filters(args).values():
+		if filter_file and not os.path.isfile(filter_file):
+			sys.exit('ERROR: namespace file filter "%s" does not exist. Exiting.' % (filter_file))
 
 	## make output directory if it does not exist.
-	if (args.graph or args.graph_single) and not os.path.isdir(args.outdir):
-		print('making output directory %s...' % (args.outdir))
-		os.makedirs(args.outdir)
+	if args.graph or args.graph_single:
+		for outdir in [args.outdir]+[get_outdir(args,namespace) for namespace in get_namespaces(args)]:
+			if not os.path.isdir(outdir):
+				print('making output directory %s...' % (outdir))
+				os.makedirs(outdir)
 
 	return args
 
@@ -4,6 +4,10 @@ import argparse
 import itertools
 import glob
 
+## shared edge pipeline (common/ lives at the top of the repository)
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','..','common'))
+from edge_pipeline import Edge
+
 def main(args):
 
     proteins = read_proteins(args.infile)
@@ -20,6 +24,12 @@ def main(args):
         else:
             print('  not writing %s -- not enough edges.' % (pathway))
 
+    if args.stats:
+        import graph_stats
+        ## SIF edges have no expansion data.
+        edges = ((pathway,e[0],e[1]) for pathway in interactions_by_pathways for e in interactions_by_pathways[pathway])
+        graph_stats.write_report('%s/graph-stats.txt' % (args.outdir),edges,pathways=list(interactions_by_pathways.keys()),expansion=False)
+
     print('done!')
     return
 
@@ -59,31 +69,54 @@ Does not handle the MEDIATOR_IDS.
 '''
 def read_interactions(infile,proteins):
     pathways = {} # pathway to edge tuple
-    DELIM = ';'
-    num_missed = 0
+    rows = interaction_rows(infile,proteins)
+    try:
+        while True:
+            edge,interaction_type,p = next(rows)
+            if p not in pathways:
+                pathways[p] = set()
+            pathways[p].add(edge)
+    except StopIteration as done:
+        ## done.value is False if we never hit PARTICIPANT_TYPE; this should never happen.
+        ## return None in this case, it's an error.
+        return pathways if done.value else None
+
+'''
+Reads the interaction section of the SIF, one (edge,interaction type,pathway) tuple at a time.
+Edges are sorted tuples of common names where both nodes are in the proteins dictionary.
+Returns True when it hits PARTICIPANT_TYPE (the end of the interactions), False otherwise.
+'''
+def interaction_rows(infile,proteins):
     with open(infile) as fin:
         for line in fin:
             if 'PARTICIPANT_TYPE' in line:
                 # done reading interactions; return.
-                return pathways
+                return True
             if 'INTERACTION_TYPE' in line:
                 # skip header
                 continue
             row = line.strip().split('\t')
             if row[0] not in proteins or row[2] not in proteins:
-                num_missed +=1
                 continue
             edge = tuple(sorted([row[0],row[2]]))
             for p in row[5].split(';'):
                 p = p.strip()
                 if p == '':
                     continue
-                if p not in pathways:
-                    pathways[p] = set()
-                pathways[p].add(edge)
-    ## this should never happen (we should return when we hit PARTICIPANT_TYPE).
-    ## return None in this case, it's an error.
-    return None
+                yield edge,row[1],p
+    return False
+
+'''
+Source stage for the shared edge pipeline (see common/edge_pipeline.py).
+Streams undirected edges from the SIF, one (edge,pathway) pair at a time,
+rather than building the pathways dictionary of read_interactions().
+Nodes are reported as uniprot IDs; edges are sorted as in read_interactions().
+'''
+def sif_edges(infile,proteins):
+    for edge,interaction_type,p in interaction_rows(infile,proteins):
+        u,v = sorted([proteins[edge[0]],proteins[edge[1]]])
+        yield Edge(u,v,False,frozenset([interaction_type]),'PathwayCommons',p)
+    return
 
 def write_file(edges,proteins,outfile):
     out = open(outfile,'w')
@@ -111,8 +144,16 @@ def parse_arguments():
     #    help='Filter converted IDs by single-column file of ids. Only IDs that appear in this file will be used.')
     parser.add_argument('-t','--thres',type=int,default=10,
         help='Do not write pathways with fewer than THRES edges. Default 10.')
+    parser.add_argument('--stats',action='store_true',
+        help='write a report of graph statistics (degrees, connected components, pathway overlap) for all pathways to OUTDIR/graph-stats.txt. Requires numpy and scipy.')
     args = parser.parse_args()
 
+    if args.stats:
+        try:
+            import graph_stats
+        except ImportError:
+            sys.exit('ERROR: --stats requires numpy and scipy. Exiting.')
+
     if not os.path.isdir(args.outdir):
         print('making output directory %s...' % (args.outdir))
         os.makedirs(args.outdir)
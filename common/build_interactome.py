@@ -0,0 +1,109 @@
+
+import sys
+import os
+import argparse
+
+## the parsers live in KEGG/ and PathwayCommons/sif-parser/.
+DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0,os.path.join(DIR,'..','KEGG'))
+sys.path.insert(0,os.path.join(DIR,'..','PathwayCommons','sif-parser'))
+
+import edge_pipeline
+
+def main(args):
+	"""
+	Main function. Streams KEGG and/or PathwayCommons edges concurrently
+	into a single deduplicated interactome.
+
+	Parameters
+	---------
+	args: ArgumentParser object
+
+	"""
+
+	sources = []
+
+	if args.kegg:
+		import parse_kegg
+		from Bio.KEGG import REST
+		if args.graph_single:
+			pathways = [args.graph_single]
+		else:
+			pathways = REST.kegg_list('pathway',org=args.species)
+		kegg2id,id2kegg = parse_kegg.map_namespace(args)
+		sources.append(parse_kegg.kgml_edges(pathways,args,kegg2id))
+
+	if args.sif:
+		import parse_pc
+		for infile in args.sif:
+			proteins = parse_pc.read_proteins(infile)
+			sources.append(parse_pc.sif_edges(infile,proteins))
+
+	stages = []
+	if args.filter:
+		allowed = set()
+		with open(args.filter) as fin:
+			for line in fin:
+				allowed.add(line.strip())
+		stages.append(edge_pipeline.node_filter(allowed))
+	if args.merge:
+		stages.append(edge_pipeline.merge)
+	else:
+		stages.append(edge_pipeline.dedupe)
+
+	edge_pipeline.run_pipeline(sources,stages,edge_pipeline.tsv_writer(args.outfile),maxsize=args.queue_size)
+
+	print('done!')
+	return
+
+def parse_arguments():
+	"""
+	Argument Parser for build_interactome.py.
+
+	Returns
+	-----------
+	ArgumentParser object
+
+	"""
+	parser = argparse.ArgumentParser('Interactome Builder. Combines KEGG and PathwayCommons edges into one deduplicated interactome. At least one of --kegg or --sif must be specified.')
+	parser.add_argument('--kegg',action='store_true',help='include edges from all KEGG pathways for the species (or the --graph_single pathway).')
+	parser.add_argument('--graph_single',help='with --kegg, include a single KEGG pathway (e.g. hsa04310).')
+	parser.add_argument('-s','--species',default='hsa',help='KEGG species/taxon identifier. Default is hsa.')
+	parser.add_argument('-c','--convert',default='uniprot',help='convert kegg id to this case insensitive id/namespace. PathwayCommons edges are always UniProtKB IDs. Default is uniprot')
+	parser.add_argument('-k','--kgml_dir',help='directory of KGML files (pulled down from KEGG if they do not exist). Required with --kegg.')
+	parser.add_argument('--sif',nargs='+',help='PathwayCommons SIF file(s).')
+	parser.add_argument('-f','--filter',help='filter nodes by single-column file of ids. Only IDs that appear in this file will be used.')
+	parser.add_argument('--merge',action='store_true',help='merge the edge types, sources, and pathways of duplicate edges, and sort the output. Holds every edge in memory until all sources are done. Default is to keep the first record of each edge as it streams through.')
+	parser.add_argument('-o','--outfile',help='interactome output file. Required.',required=True)
+	parser.add_argument('-q','--queue_size',type=int,default=10000,help='maximum number of edges buffered between stages. Default 10000.')
+	args = parser.parse_args()
+
+	if not (args.kegg or args.sif):
+		sys.exit('ERROR: --kegg or --sif must be specified. Exiting.')
+
+	if ',' in args.convert:
+		sys.exit('ERROR: --convert must be a single namespace. Exiting.')
+
+	## PathwayCommons edges are UniProtKB IDs, so KEGG edges must be too.
+	if args.sif and args.convert.lower() != 'uniprot':
+		sys.exit('ERROR: --sif requires --convert uniprot (PathwayCommons edges are UniProtKB IDs). Exiting.')
+
+	if args.kegg and not args.kgml_dir:
+		sys.exit('ERROR: --kgml_dir must be specified with --kegg. Exiting.')
+
+	## if a filter file is specified, it must exist.
+	if args.filter and not os.path.isfile(args.filter):
+		sys.exit('ERROR: namespace file filter "%s" does not exist. Exiting.' % (args.filter))
+
+	## parse_kegg.kgml_edges() reads & writes KGML files in args.outdir.
+	args.outdir = args.kgml_dir
+	args.graph = args.kegg and not args.graph_single
+	if args.kegg and not os.path.isdir(args.kgml_dir):
+		print('making KGML directory %s...' % (args.kgml_dir))
+		os.makedirs(args.kgml_dir)
+
+	return args
+
+if __name__ == '__main__':
+	args = parse_arguments()
+	main(args)
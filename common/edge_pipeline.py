@@ -0,0 +1,237 @@
+## Shared streaming edge pipeline for the KEGG and PathwayCommons parsers.
+## Sources are generators of Edge records (parse_kegg.kgml_edges(), parse_pc.sif_edges()).
+## Each source and each stage (dedupe, filter, ...) runs in its own thread, with a
+## bounded queue between consecutive steps, and the writer consumes the last queue.
+import os
+import threading
+import queue
+from collections import namedtuple
+
+## Common edge record.
+## node1, node2: node identifiers (in the namespace of the output, e.g. UniProtKB)
+## directed: True if the edge is directed, False otherwise.  Undirected edges are
+##   reported once; sources should sort (node1,node2) so that the orientation is canonical.
+## edge_type: frozenset of edge/relation types.
+## source: database the edge came from (e.g. 'KEGG' or 'PathwayCommons').  After merge,
+##   this is a frozenset of all the databases the edge came from.
+## pathway: pathway the edge came from.  After merge, this is a frozenset of all the
+##   pathways the edge came from.
+Edge = namedtuple('Edge',['node1','node2','directed','edge_type','source','pathway'])
+
+_DONE = object() # sentinel put on a queue when a source or stage is exhausted.
+
+def edge_key(edge):
+	"""
+	Key that identifies an edge regardless of source, pathway, and edge type.
+
+	Parameters
+	-----------
+	edge: Edge
+
+	Returns
+	-----------
+	tuple
+	   (node1,node2,directed), where the nodes of undirected edges are sorted.
+
+	"""
+	if edge.directed:
+		return (edge.node1,edge.node2,True)
+	return tuple(sorted([edge.node1,edge.node2]))+(False,)
+
+def dedupe(edges):
+	"""
+	Dedupe stage: passes on the first record of every edge (see edge_key()) and drops
+	the rest.  Only edge keys are kept, so edges stream through.  Sources run
+	concurrently, so which record of a duplicated edge is kept (and so its edge type,
+	source, and pathway) depends on the order that records arrive in; use merge() to
+	keep all of them.
+
+	Parameters
+	-----------
+	edges: iterable of Edge
+
+	Yields
+	-----------
+	Edge
+	   first record of each edge.
+
+	"""
+	seen = set()
+	for edge in edges:
+		key = edge_key(edge)
+		if key in seen:
+			continue
+		seen.add(key)
+		yield edge
+	return
+
+def merge(edges):
+	"""
+	Merge stage: merges all the records of every edge (see edge_key()) into one, with the
+	union of their edge types, sources, and pathways.  This stage is a barrier: it holds
+	every edge until all sources are exhausted, then passes the merged edges on sorted
+	by edge key, so the output does not depend on thread timing.  Use it as the final
+	stage, in place of dedupe().
+
+	Parameters
+	-----------
+	edges: iterable of Edge
+
+	Yields
+	-----------
+	Edge
+	   merged edge record; source and pathway are frozensets.  Undirected edges are
+	   in sorted orientation.
+
+	"""
+	merged = {} # edge key to [edge_types,sources,pathways]
+	for edge in edges:
+		key = edge_key(edge)
+		if key not in merged:
+			merged[key] = [set(),set(),set()]
+		merged[key][0].update(edge.edge_type)
+		merged[key][1].update(as_set(edge.source))
+		merged[key][2].update(as_set(edge.pathway))
+
+	for key in sorted(merged):
+		edge_types,sources,pathways = merged.pop(key)
+		yield Edge(key[0],key[1],key[2],frozenset(edge_types),frozenset(sources),frozenset(pathways))
+	return
+
+def as_set(value):
+	"""
+	Returns a string as a single-element set; sets and frozensets are returned as they are.
+	"""
+	if type(value) == set or type(value) == frozenset:
+		return value
+	return set([value])
+
+def node_filter(allowed):
+	"""
+	Makes a filter stage that retains edges where both nodes are allowed.
+
+	Parameters
+	-----------
+	allowed: set
+	   set of allowed node identifiers.
+
+	Returns
+	-----------
+	function
+	   stage that takes an iterable of Edge and yields Edge.
+
+	"""
+	def stage(edges):
+		for edge in edges:
+			if edge.node1 in allowed and edge.node2 in allowed:
+				yield edge
+		return
+	return stage
+
+def tsv_writer(outfile):
+	"""
+	Makes a writer that writes edges to a tab-delimited file.
+
+	Parameters
+	-----------
+	outfile: string
+	   Output file name
+
+	Returns
+	-----------
+	function
+	   writer that takes an iterable of Edge and returns the number of edges written.
+
+	"""
+	def writer(edges):
+		# write to a temporary file, so that a failed source doesn't leave a partial outfile.
+		tmp_file = '%s.tmp' % (outfile)
+		num = 0
+		out = open(tmp_file,'w')
+		try:
+			out.write('#node1\tnode2\tdirected\tedge_type\tsource\tpathway\n')
+			for edge in edges:
+				out.write('%s\t%s\t%s\t%s\t%s\t%s\n' % (edge.node1,edge.node2,edge.directed,'|'.join(sorted(edge.edge_type)),
+					'|'.join(sorted(as_set(edge.source))),'|'.join(sorted(as_set(edge.pathway)))))
+				num+=1
+		except BaseException:
+			out.close()
+			os.remove(tmp_file)
+			raise
+		out.close()
+		os.replace(tmp_file,outfile)
+		print(' wrote %d edges to %s' % (num,outfile))
+		return num
+	return writer
+
+def run_pipeline(sources,stages,writer,maxsize=10000):
+	"""
+	Runs each source concurrently into a bounded queue, and each stage in its own
+	thread, reading from the previous queue and feeding the next one.  The writer
+	consumes the last queue.
+
+	Parameters
+	-----------
+	sources: list
+	   list of iterables of Edge (typically generators).
+	stages: list
+	   list of functions that take an iterable of Edge and yield Edge, applied in order.
+	writer: function
+	   function that consumes an iterable of Edge.
+	maxsize: int
+	   maximum number of edges waiting in each queue.  Sources and stages block when
+	   the next queue is full.
+
+	Returns
+	-----------
+	the value returned by the writer.
+
+	"""
+	errors = []
+
+	def produce(edges,q):
+		try:
+			for edge in edges:
+				q.put(edge)
+		except BaseException as e: # includes SystemExit from the parsers.
+			if e not in errors: # stages re-raise the error of a failed source or stage.
+				errors.append(e)
+		finally:
+			q.put(_DONE)
+		return
+
+	def consume(q,num_producers):
+		num_done = 0
+		while num_done < num_producers:
+			edge = q.get()
+			if edge is _DONE:
+				num_done+=1
+				# stop as soon as a source or stage fails, so the writer does not finish a partial output.
+				if errors:
+					raise errors[0]
+			else:
+				yield edge
+		return
+
+	threads = []
+	q = queue.Queue(maxsize=maxsize)
+	for source in sources:
+		threads.append(threading.Thread(target=produce,args=(source,q),daemon=True))
+	num_producers = len(sources)
+	for stage in stages:
+		next_q = queue.Queue(maxsize=maxsize)
+		threads.append(threading.Thread(target=produce,args=(stage(consume(q,num_producers)),next_q),daemon=True))
+		q,num_producers = next_q,1
+	for t in threads:
+		t.start()
+
+	try:
+		result = writer(consume(q,num_producers))
+	except BaseException:
+		if errors:
+			print('ERROR: %d source(s) or stage(s) failed.' % (len(errors)))
+		raise
+
+	for t in threads:
+		t.join()
+	return result
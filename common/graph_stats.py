@@ -0,0 +1,292 @@
+## Graph statistics for parsed pathways, computed with sparse adjacency matrices.
+## Used by the --stats options of parse_kegg.py and parse_pc.py. Requires numpy and scipy.
+##
+## Every pathway is treated as a simple undirected graph (edge direction and self-loops
+## are ignored).  Pathways are stacked into one block-diagonal graph whose nodes are
+## (pathway,node) pairs, so that the per-pathway degrees and connected components are
+## computed with a single call each, instead of one call per pathway.
+##
+## The report has five sections: a summary & degree distribution of the merged graph,
+## a summary of every pathway, the degree distribution of every pathway, and the
+## overlap (shared edges & Jaccard index) of every pair of pathways that share an edge.
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+
+def write_report(outfile,edges,pathways=None,expansion=True):
+	"""
+	Computes summary statistics for every pathway and for the merged graph
+	(the union of all pathways), and writes them to a single report.
+
+	Parameters
+	-----------
+	outfile: string
+	   Report output file name
+	edges: iterable
+	   edges as (pathway,node1,node2,is_expansion) tuples. is_expansion is True if
+	   the edge only comes from group (complex) or family expansion. An undirected
+	   edge that appears more than once (e.g. in both orientations) is an expansion
+	   edge only if all of its records are.
+	   If expansion is False, edges are (pathway,node1,node2) tuples.
+	pathways: list
+	   names of all the processed pathways, in report order. Pathways without edges
+	   are reported with zero nodes and edges. If None (default), only pathways
+	   that appear in edges are reported.
+	expansion: bool
+	   True (default) if edges have expansion data; if False, the expansion_fraction
+	   columns are left out of the report.
+
+	"""
+	pathway_names,p,u,v,is_expansion = index_edges(edges,pathways,expansion)
+	num_pathways = len(pathway_names)
+	num_nodes = int(max(u.max(),v.max()))+1 if len(u) > 0 else 0
+
+	## simple undirected edges: sorted node pairs without self-loops, unique within each pathway.
+	a = np.minimum(u,v)
+	b = np.maximum(u,v)
+	keep = a != b
+	## (pathway,node1,node2) is packed into a single int64 key, which is much faster to make unique than rows.
+	keys,inverse = np.unique((p[keep]*num_nodes+a[keep])*num_nodes+b[keep],return_inverse=True)
+	p,a,b = keys//(num_nodes*num_nodes),(keys//num_nodes)%num_nodes,keys%num_nodes
+
+	## an edge is from expansion if none of its records is a non-expansion record.
+	if expansion:
+		not_expansion = np.zeros(len(keys))
+		np.maximum.at(not_expansion,inverse,1-is_expansion[keep])
+
+	pathway_stats = block_stats(p,a,b,num_pathways,num_nodes)
+	overlap = pathway_overlap(p,a,b,num_pathways,num_nodes)
+	most_overlapping,max_jaccard,overlap_pairs = overlap
+
+	## share of (unique, undirected) edges that come from expansion, per pathway.
+	nodes,num_edges,max_degree,components,largest,degree_distribution = pathway_stats
+	if expansion:
+		expansion_fraction = np.bincount(p,weights=1-not_expansion,minlength=num_pathways)/np.maximum(num_edges,1)
+
+	## merged graph: unique node pairs over all pathways.
+	merged_pairs,merged_inverse = np.unique(a*num_nodes+b,return_inverse=True)
+	if expansion:
+		merged_not_expansion = np.zeros(len(merged_pairs))
+		np.maximum.at(merged_not_expansion,merged_inverse,not_expansion)
+		merged_expansion_fraction = 1-merged_not_expansion.mean() if len(merged_pairs) > 0 else 0.0
+	merged = adjacency(merged_pairs//num_nodes,merged_pairs%num_nodes,num_nodes) if num_nodes > 0 else sparse.csr_matrix((0,0))
+	merged_degrees = np.asarray(merged.sum(axis=1)).ravel()
+	merged_nodes = merged_degrees > 0
+	num_components,labels = csgraph.connected_components(merged,directed=False)
+	component_sizes = np.bincount(labels[merged_nodes]) if merged_nodes.any() else np.zeros(1,dtype=int)
+
+	out = open(outfile,'w')
+	out.write('## merged graph\n')
+	out.write('nodes\t%d\n' % (merged_nodes.sum()))
+	out.write('edges\t%d\n' % (len(merged_pairs)))
+	out.write('pathways\t%d\n' % (num_pathways))
+	out.write('components\t%d\n' % (np.count_nonzero(component_sizes)))
+	out.write('largest_component\t%d\n' % (component_sizes.max()))
+	out.write('mean_degree\t%.4f\n' % (merged_degrees[merged_nodes].mean() if merged_nodes.any() else 0.0))
+	out.write('max_degree\t%d\n' % (merged_degrees.max() if num_nodes > 0 else 0))
+	if expansion:
+		out.write('expansion_fraction\t%.4f\n' % (merged_expansion_fraction))
+
+	out.write('\n## degree distribution (merged graph)\n')
+	out.write('#degree\tnum_nodes\n')
+	histogram = np.bincount(merged_degrees[merged_nodes].astype(int))
+	for degree in np.flatnonzero(histogram):
+		out.write('%d\t%d\n' % (degree,histogram[degree]))
+
+	out.write('\n## pathways\n')
+	out.write('#pathway\tnodes\tedges\tmean_degree\tmax_degree\tcomponents\tlargest_component\t%smost_overlapping_pathway\tmax_edge_jaccard\n' % ('expansion_fraction\t' if expansion else ''))
+	for i,name in enumerate(pathway_names):
+		overlapping = pathway_names[most_overlapping[i]] if most_overlapping[i] >= 0 else 'None'
+		out.write('%s\t%d\t%d\t%.4f\t%d\t%d\t%d\t%s%s\t%.4f\n' % (name,nodes[i],num_edges[i],2.0*num_edges[i]/max(nodes[i],1),
+			max_degree[i],components[i],largest[i],'%.4f\t' % (expansion_fraction[i]) if expansion else '',overlapping,max_jaccard[i]))
+
+	out.write('\n## degree distribution (pathways)\n')
+	out.write('#pathway\tdegree\tnum_nodes\n')
+	for i,degree,count in zip(*degree_distribution):
+		out.write('%s\t%d\t%d\n' % (pathway_names[i],degree,count))
+
+	out.write('\n## pathway overlap (pairs of pathways that share at least one edge)\n')
+	out.write('#pathway1\tpathway2\tshared_edges\tedge_jaccard\n')
+	for i,j,inter,jaccard in zip(*overlap_pairs):
+		out.write('%s\t%s\t%d\t%.4f\n' % (pathway_names[i],pathway_names[j],inter,jaccard))
+	out.close()
+
+	print(' wrote statistics for %d pathways (%d nodes & %d edges in merged graph) to %s' % (num_pathways,merged_nodes.sum(),len(merged_pairs),outfile))
+	return
+
+def index_edges(edges,pathways=None,expansion=True):
+	"""
+	Maps pathways and nodes to integer indices.
+
+	Parameters
+	-----------
+	edges: iterable
+	   edges as (pathway,node1,node2,is_expansion) tuples, or (pathway,node1,node2)
+	   tuples if expansion is False.
+	pathways: list
+	   names of all the pathways, which get the first indices (in order). Pathways
+	   in edges that are not in this list are indexed after them.
+	expansion: bool
+	   True (default) if edges have is_expansion values.
+
+	Returns
+	-----------
+	list
+	   pathway names, in index order
+	numpy array
+	   pathway index of each edge
+	numpy array
+	   node1 index of each edge
+	numpy array
+	   node2 index of each edge
+	numpy array
+	   1.0 if the edge is from expansion, 0.0 otherwise (None if expansion is False)
+
+	"""
+	pathway_index = {}
+	for pathway in pathways or []:
+		pathway_index.setdefault(pathway,len(pathway_index))
+	node_index = {}
+	p,u,v,is_expansion = [],[],[],[]
+	for edge in edges:
+		p.append(pathway_index.setdefault(edge[0],len(pathway_index)))
+		u.append(node_index.setdefault(edge[1],len(node_index)))
+		v.append(node_index.setdefault(edge[2],len(node_index)))
+		if expansion:
+			is_expansion.append(edge[3])
+	pathway_names = sorted(pathway_index,key=pathway_index.get)
+	is_expansion = np.array(is_expansion,dtype=float) if expansion else None
+	return pathway_names,np.array(p,dtype=np.int64),np.array(u,dtype=np.int64),np.array(v,dtype=np.int64),is_expansion
+
+def adjacency(a,b,n):
+	"""
+	Makes a symmetric (undirected) binary sparse adjacency matrix.
+
+	Parameters
+	-----------
+	a: numpy array
+	   first node of each edge
+	b: numpy array
+	   second node of each edge
+	n: int
+	   number of nodes
+
+	Returns
+	-----------
+	scipy.sparse.csr_matrix
+
+	"""
+	rows = np.concatenate([a,b])
+	cols = np.concatenate([b,a])
+	return sparse.csr_matrix((np.ones(len(rows),dtype=np.int64),(rows,cols)),shape=(n,n))
+
+def block_stats(p,a,b,num_pathways,num_nodes):
+	"""
+	Computes per-pathway node counts, edge counts, max degrees, and connected components
+	on the block-diagonal graph of all pathways.
+
+	Parameters
+	-----------
+	p: numpy array
+	   pathway index of each (unique, undirected) edge
+	a: numpy array
+	   first node of each edge
+	b: numpy array
+	   second node of each edge
+	num_pathways: int
+	num_nodes: int
+
+	Returns
+	-----------
+	tuple of numpy arrays (one value per pathway)
+	   number of nodes, number of edges, maximum degree, number of connected components,
+	   and size of the largest connected component.
+	tuple of numpy arrays
+	   degree distribution of every pathway, as (pathway,degree,number of nodes) columns,
+	   sorted by pathway and degree.
+
+	"""
+	## block nodes are (pathway,node) pairs.
+	block_keys,inverse = np.unique(np.concatenate([p*num_nodes+a,p*num_nodes+b]),return_inverse=True)
+	block_pathway = block_keys//max(num_nodes,1)
+	n = len(block_keys)
+	ba,bb = inverse[:len(p)],inverse[len(p):]
+
+	degrees = np.bincount(np.concatenate([ba,bb]),minlength=n)
+	nodes = np.bincount(block_pathway,minlength=num_pathways)
+	num_edges = np.bincount(p,minlength=num_pathways)
+	max_degree = np.zeros(num_pathways,dtype=np.int64)
+	np.maximum.at(max_degree,block_pathway,degrees)
+
+	## degree distributions: count the (pathway,degree) pairs of all block nodes at once.
+	num_degrees = int(degrees.max())+1 if n > 0 else 1
+	pathway_degrees,counts = np.unique(block_pathway*num_degrees+degrees,return_counts=True)
+	degree_distribution = (pathway_degrees//num_degrees,pathway_degrees%num_degrees,counts)
+
+	## components never cross pathways, so each component belongs to the pathway of its nodes.
+	num_components,labels = csgraph.connected_components(adjacency(ba,bb,n),directed=False)
+	component_sizes = np.bincount(labels,minlength=num_components)
+	component_pathway = np.zeros(num_components,dtype=np.int64)
+	component_pathway[labels] = block_pathway
+	components = np.bincount(component_pathway,minlength=num_pathways) if num_components > 0 else np.zeros(num_pathways,dtype=np.int64)
+	largest = np.zeros(num_pathways,dtype=np.int64)
+	np.maximum.at(largest,component_pathway,component_sizes)
+
+	return nodes,num_edges,max_degree,components,largest,degree_distribution
+
+def pathway_overlap(p,a,b,num_pathways,num_nodes):
+	"""
+	Computes the overlap of every pair of pathways that share an edge, and finds the
+	most overlapping pathway of each pathway, by the Jaccard index of their edge sets.
+	Uses the pathway-by-edge incidence matrix M, where M*M^T counts the edges that
+	every pair of pathways share.
+
+	Parameters
+	-----------
+	p: numpy array
+	   pathway index of each (unique, undirected) edge
+	a: numpy array
+	   first node of each edge
+	b: numpy array
+	   second node of each edge
+	num_pathways: int
+	num_nodes: int
+
+	Returns
+	-----------
+	numpy array
+	   index of the most overlapping pathway (-1 if no other pathway shares an edge)
+	numpy array
+	   Jaccard index with the most overlapping pathway
+	tuple of numpy arrays
+	   overlapping pairs of pathways (i < j), as (i,j,number of shared edges,Jaccard index) columns.
+
+	"""
+	most_overlapping = np.full(num_pathways,-1,dtype=np.int64)
+	max_jaccard = np.zeros(num_pathways)
+	if len(p) == 0:
+		empty = np.array([],dtype=np.int64)
+		return most_overlapping,max_jaccard,(empty,empty,empty,np.array([]))
+
+	pairs,edge_index = np.unique(a*num_nodes+b,return_inverse=True)
+	incidence = sparse.csr_matrix((np.ones(len(p),dtype=np.int64),(p,edge_index)),shape=(num_pathways,len(pairs)))
+	sizes = np.asarray(incidence.sum(axis=1)).ravel()
+
+	shared = (incidence @ incidence.T).tocoo()
+	off_diagonal = shared.row != shared.col
+	rows,cols,inter = shared.row[off_diagonal],shared.col[off_diagonal],shared.data[off_diagonal]
+	jaccard = inter/(sizes[rows]+sizes[cols]-inter)
+
+	## every pair once, sorted by pathway index.
+	upper = rows < cols
+	order = np.lexsort((cols[upper],rows[upper]))
+	overlap_pairs = (rows[upper][order],cols[upper][order],inter[upper][order],jaccard[upper][order])
+
+	## the last entry of each row, sorted by Jaccard index, is the maximum.
+	order = np.lexsort((jaccard,rows))
+	rows,cols,jaccard = rows[order],cols[order],jaccard[order]
+	last = np.flatnonzero(np.append(rows[1:] != rows[:-1],True)) if len(rows) > 0 else np.array([],dtype=np.int64)
+	most_overlapping[rows[last]] = cols[last]
+	max_jaccard[rows[last]] = jaccard[last]
+
+	return most_overlapping,max_jaccard,overlap_pairs